@@ -1,22 +1,42 @@
+import os
 import sys
-from linter import Linter
+from linter import Linter, lint_files, lint_path
+
+def collect_paths(args):
+    paths = []
+    for arg in args:
+        if os.path.isdir(arg):
+            found = []
+            for root, _, files in os.walk(arg):
+                found.extend(os.path.join(root, name) for name in files if name.endswith(".py"))
+            paths.extend(sorted(found))
+        else:
+            paths.append(arg)
+    return paths
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python run_linter.py <file_to_lint.py>")
+    if len(sys.argv) < 2:
+        print("Usage: python run_linter.py <file_or_directory> [...]")
         sys.exit(1)
 
-    filename = sys.argv[1]
-    with open(filename, "r", encoding="utf-8") as f:
-        source_code = f.read()
+    paths = collect_paths(sys.argv[1:])
+    if not paths:
+        print("No Python files found to lint.")
+        sys.exit(1)
 
-    linter = Linter()
-    errors = linter.lint(source_code)
+    if len(paths) == 1:
+        results = [(paths[0], lint_path(Linter(), paths[0]))]
+    else:
+        results = lint_files(paths)
 
-    if errors:
+    found_issues = False
+    for path, errors in results:
+        prefix = f"{path}: " if len(paths) > 1 else ""
         for error in errors:
-            print(f"[{error.rule_name}] Line {error.line_number}: {error.message}")
-    else:
+            found_issues = True
+            print(f"{prefix}[{error.rule_name}] Line {error.line_number}: {error.message}")
+
+    if not found_issues:
         print("No linting issues found!")
 
 if __name__ == "__main__":
@@ -0,0 +1,22 @@
+"""Packaging for the linter.
+
+Set LINTER_USE_MYPYC=1 to compile linter.py to a C extension with mypyc;
+otherwise the pure-Python module is installed unchanged.
+"""
+import os
+
+from setuptools import setup
+
+ext_modules = []
+if os.environ.get("LINTER_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["linter.py"])
+
+setup(
+    name="python-linter",
+    version="0.1.0",
+    py_modules=["linter", "run_linter"],
+    ext_modules=ext_modules,
+    python_requires=">=3.10",
+)
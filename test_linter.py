@@ -0,0 +1,151 @@
+import pickle
+import textwrap
+
+import linter
+from linter import LintError, Linter, lint_files
+
+
+def lint(source):
+    errors = Linter().lint(textwrap.dedent(source))
+    return [(e.rule_name, e.line_number, e.message) for e in errors]
+
+
+def test_unused_imports():
+    assert lint("""\
+        import os
+        import sys
+        from collections import OrderedDict as OD, defaultdict
+        print(sys, defaultdict)
+    """) == [
+        ("unused_import", 1, "Imported name 'os' is unused"),
+        ("unused_import", 3, "Imported name 'OD' is unused"),
+    ]
+
+
+def test_errors_are_ordered_by_line_then_rule():
+    assert lint("""\
+        import os
+        import sys
+
+        def my_function():
+            x = 10
+            y = 20
+            print(y)
+
+        my_dict = {"a": 1, "b": 2, "a": 3}
+    """) == [
+        ("unused_import", 1, "Imported name 'os' is unused"),
+        ("unused_import", 2, "Imported name 'sys' is unused"),
+        ("unused_variable", 5, "Variable 'x' is unused"),
+        ("unused_variable", 9, "Variable 'my_dict' is unused"),
+        ("duplicate_dict_keys", 9, 'Key "a" has been repeated on lines 9, 9'),
+    ]
+
+
+def test_duplicate_keys_in_nested_dicts():
+    assert lint("""\
+        data = {
+            "x": {
+                "k": 1,
+                "k": 2,
+            },
+            "x": 3,
+        }
+        print(data)
+    """) == [
+        ("duplicate_dict_keys", 2, 'Key "x" has been repeated on lines 2, 6'),
+        ("duplicate_dict_keys", 3, 'Key "k" has been repeated on lines 3, 4'),
+    ]
+
+
+def test_duplicate_keys_in_dict_inside_list():
+    assert lint("""\
+        config = [
+            {"a": 1, "b": 2, "a": 3},
+        ]
+        print(config)
+    """) == [
+        ("duplicate_dict_keys", 2, 'Key "a" has been repeated on lines 2, 2'),
+    ]
+
+
+def test_shadowed_names_resolve_to_innermost_scope():
+    # The comprehension's x shadows the argument, which is never read, and
+    # the class attribute x is separate from the module-level x.
+    assert lint("""\
+        x = 1
+
+        def f(x):
+            return [x for x in range(3)]
+
+        class C:
+            x = 2
+
+        print(x)
+    """) == [
+        ("unused_variable", 3, "Variable 'x' is unused"),
+        ("unused_variable", 7, "Variable 'x' is unused"),
+    ]
+
+
+def test_nested_assignment_targets():
+    assert lint("""\
+        a, (b, [c, d]) = 1, (2, [3, 4])
+        [e, f], g = h = (5, 6), 7
+        print(a, d, g)
+    """) == [
+        ("unused_variable", 1, "Variable 'b' is unused"),
+        ("unused_variable", 1, "Variable 'c' is unused"),
+        ("unused_variable", 2, "Variable 'e' is unused"),
+        ("unused_variable", 2, "Variable 'f' is unused"),
+        ("unused_variable", 2, "Variable 'h' is unused"),
+    ]
+
+
+def test_relinting_does_not_carry_errors_over():
+    cached = Linter(cache_size=4)
+    source = "import os\n"
+    assert cached.lint(source) == cached.lint(source) == Linter().lint(source)
+
+
+def test_lint_one_reports_syntax_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(linter, "_WORKER", Linter())
+    path = tmp_path / "bad.py"
+    path.write_text("def f(:\n")
+    result_path, errors = linter._lint_one(str(path))
+    assert result_path == str(path)
+    assert [(e.rule_name, e.line_number) for e in errors] == [("syntax_error", 1)]
+
+
+def test_lint_one_reports_null_bytes_as_syntax_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(linter, "_WORKER", Linter())
+    path = tmp_path / "nul.py"
+    path.write_bytes(b"x = 1\x00\n")
+    _, errors = linter._lint_one(str(path))
+    assert [e.rule_name for e in errors] == ["syntax_error"]
+
+
+def test_lint_one_reports_read_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(linter, "_WORKER", Linter())
+    path = str(tmp_path / "missing.py")
+    _, errors = linter._lint_one(path)
+    assert [(e.rule_name, e.line_number) for e in errors] == [("read_error", 0)]
+    assert errors[0].message.startswith("Could not read file:")
+
+
+def test_lint_files_keeps_input_order(tmp_path):
+    good = tmp_path / "good.py"
+    good.write_text("import os\n")
+    bad = tmp_path / "bad.py"
+    bad.write_text("def f(:\n")
+    results = list(lint_files([str(bad), str(good)]))
+    assert [path for path, _ in results] == [str(bad), str(good)]
+    assert [e.rule_name for e in results[0][1]] == ["syntax_error"]
+    assert [e.message for e in results[1][1]] == ["Imported name 'os' is unused"]
+
+
+def test_lint_error_pickles():
+    error = LintError("unused_import", 3, "Imported name '%s' is unused", ("os",))
+    restored = pickle.loads(pickle.dumps(error))
+    assert restored == error
+    assert restored.message == "Imported name 'os' is unused"